@@ -1,6 +1,10 @@
 import gradio as gr
 import json
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import tiktoken
 from langchain_text_splitters import (
@@ -11,6 +15,10 @@ from langchain_text_splitters import (
     RecursiveJsonSplitter,
     TokenTextSplitter
 )
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Data ---
 SPLITTER_CHOICES = [
@@ -32,94 +40,177 @@ SPLITTER_DESCRIPTIONS = {
     "CodeSplitter": "선택한 프로그래밍 언어(Python, JS 등)의 구문을 이해하고, 코드 구조에 맞게 텍스트를 분할합니다.",
     "RecursiveJsonSplitter": "JSON 데이터의 구조를 유지하면서 지정된 크기에 맞게 분할합니다."
 }
+_desc_get = SPLITTER_DESCRIPTIONS.get
+
+_POOL = ThreadPoolExecutor(max_workers=4)
+
+# 토크나이저 탐색기에 표시할 최대 토큰 수
+MAX_TOKENS_SHOWN = 2000
+
+# --- Tokenizer ---
+@lru_cache(maxsize=4)
+def _get_encoding(name="cl100k_base"):
+    # BPE 어휘는 프로세스당 한 번만 로드합니다.
+    return tiktoken.get_encoding(name)
 
 # --- Core Splitting and Analysis Logic ---
 def run_all_analysis(text, splitter_name, chunk_size, chunk_overlap, language):
+    chunks, boundary_viz, length_df, tokenizer_output = _run_all_analysis_cached(
+        text, splitter_name, chunk_size, chunk_overlap, language
+    )
+    if not isinstance(chunks, list):
+        error_message = chunks
+        return error_message, [], length_df, None, gr.update(visible=False)
+
+    tokenizer_visibility = gr.update(visible=splitter_name == "TokenTextSplitter")
+
+    # BarPlot 컴포넌트는 UI에 선언되어 있으므로 데이터프레임만 전달합니다.
+    return chunks, boundary_viz, length_df, tokenizer_output, tokenizer_visibility
+
+@lru_cache(maxsize=16)
+def _run_all_analysis_cached(text, splitter_name, chunk_size, chunk_overlap, language):
+    # 같은 입력/설정이면 이전 결과를 그대로 돌려줍니다. (Gradio 컴포넌트는 캐시하지 않음)
     # 1. Split Text
     chunks = split_text(text, splitter_name, chunk_size, chunk_overlap, language)
     if not isinstance(chunks, list):
-        error_message = chunks
-        empty_plot = pd.DataFrame({"Chunk": [], "Length": []})
-        return error_message, [], gr.BarPlot(value=empty_plot), None, gr.update(visible=False)
+        return chunks, [], pd.DataFrame({"Chunk": [], "Length": []}), None
 
-    # 2. Create Visualizations
-    boundary_viz = create_boundary_viz(text, chunks)
-    length_plot = create_length_plot(chunks)
-    
-    # 3. Handle Tokenizer Explorer
+    # 2. Create Visualizations / 3. Handle Tokenizer Explorer (서로 독립적이므로 동시에 실행)
+    # 헤더 기반 스플리터는 Document를 반환하므로 길이 계산에는 본문 문자열을 사용합니다.
+    # (경계 시각화는 create_boundary_viz에서 안내 메시지로 대체됩니다.)
+    texts = chunks if not chunks or isinstance(chunks[0], str) else [
+        getattr(chunk, "page_content", str(chunk)) for chunk in chunks
+    ]
+    fut_viz = _POOL.submit(create_boundary_viz, text, chunks)
+    fut_plot = _POOL.submit(create_length_plot, texts)
     is_tokenizer_selected = splitter_name == "TokenTextSplitter"
-    tokenizer_output = explore_tokens(text) if is_tokenizer_selected else ""
-    tokenizer_visibility = gr.update(visible=is_tokenizer_selected)
+    fut_tok = _POOL.submit(explore_tokens, text) if is_tokenizer_selected else None
+
+    boundary_viz = fut_viz.result()
+    length_df = fut_plot.result()
+    tokenizer_output = fut_tok.result() if fut_tok else ""
 
-    return chunks, boundary_viz, length_plot, tokenizer_output, tokenizer_visibility
+    return chunks, boundary_viz, length_df, tokenizer_output
+
+@lru_cache(maxsize=32)
+def _make_splitter(splitter_name, chunk_size, chunk_overlap, language=None):
+    # 같은 설정의 스플리터는 다시 만들지 않고 재사용합니다. 선택된 스플리터만 생성됩니다.
+    match splitter_name:
+        case "CodeSplitter":
+            return RecursiveCharacterTextSplitter.from_language(
+                language=language, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            )
+        case "CharacterTextSplitter":
+            return CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        case "RecursiveCharacterTextSplitter":
+            return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        case "TokenTextSplitter":
+            return TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        case "MarkdownHeaderTextSplitter":
+            return MarkdownHeaderTextSplitter(
+                headers_to_split_on=[("#", "Header 1"),("##", "Header 2"),("###", "Header 3")]
+            )
+        case "HTMLHeaderTextSplitter":
+            return HTMLHeaderTextSplitter(
+                headers_to_split_on=[("h1", "Header 1"),("h2", "Header 2")]
+            )
+        case "RecursiveJsonSplitter":
+            return RecursiveJsonSplitter(max_chunk_size=chunk_size)
+        case _:
+            return None
 
 def split_text(text, splitter_name, chunk_size, chunk_overlap, language):
     try:
         if splitter_name == "CodeSplitter":
             if language:
-                splitter = RecursiveCharacterTextSplitter.from_language(
-                    language=language, chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                )
+                splitter = _make_splitter(splitter_name, chunk_size, chunk_overlap, language)
             else:
                 return "CodeSplitter를 사용하려면 언어를 선택해주세요."
         else:
-            splitter_map = {
-                "CharacterTextSplitter": CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap),
-                "RecursiveCharacterTextSplitter": RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap),
-                "TokenTextSplitter": TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap),
-                "MarkdownHeaderTextSplitter": MarkdownHeaderTextSplitter(headers_to_split_on=[("#", "Header 1"),("##", "Header 2"),("###", "Header 3")]),
-                "HTMLHeaderTextSplitter": HTMLHeaderTextSplitter(headers_to_split_on=[("h1", "Header 1"),("h2", "Header 2")]),
-                "RecursiveJsonSplitter": RecursiveJsonSplitter(max_chunk_size=chunk_size),
-            }
-            splitter = splitter_map.get(splitter_name)
+            splitter = _make_splitter(splitter_name, chunk_size, chunk_overlap)
         if splitter is None: return "잘못된 스플리터를 선택했습니다."
         return splitter.split_text(text)
     except Exception as e:
         return str(e)
 
 def create_boundary_viz(text, chunks):
-    viz_data = []
+    # 헤더 기반 스플리터는 원문의 부분 문자열이 아닌 Document를 반환하므로 탐색하지 않습니다.
+    if chunks and not isinstance(chunks[0], str):
+        return [("경계 시각화는 헤더 기반 스플리터에서 지원되지 않습니다.", None)]
+    # 청크마다 최대 2개(앞 간격 + 청크), 마지막에 남은 텍스트 1개
+    viz_data = [None] * (2 * len(chunks) + 1)
+    k = 0
+    lens = [len(chunk) for chunk in chunks]
+    t_find = text.find
+    t_startswith = text.startswith
     last_index = 0
     for i, chunk in enumerate(chunks):
-        try:
-            start_index = text.index(chunk, last_index)
-            if start_index > last_index:
-                viz_data.append((text[last_index:start_index], None))
-            viz_data.append((chunk, f"Chunk {i+1}"))
-            last_index = start_index + len(chunk)
-        except ValueError:
-            viz_data.append((f" [CHUNK {i+1} NOT FOUND IN ORIGINAL TEXT] ", "Error"))
-            viz_data.append((chunk, f"Chunk {i+1}"))
+        # 연속된 청크는 현재 위치에서 바로 시작하므로 재탐색을 피합니다.
+        if t_startswith(chunk, last_index):
+            start_index = last_index
+        else:
+            start_index = t_find(chunk, last_index)
+        if start_index == -1:
+            viz_data[k] = (f" [CHUNK {i+1} NOT FOUND IN ORIGINAL TEXT] ", "Error")
+            viz_data[k + 1] = (chunk, f"Chunk {i+1}")
+            k += 2
+            continue
+        if start_index > last_index:
+            viz_data[k] = (text[last_index:start_index], None)
+            k += 1
+        viz_data[k] = (chunk, f"Chunk {i+1}")
+        k += 1
+        last_index = start_index + lens[i]
 
     if last_index < len(text):
-        viz_data.append((text[last_index:], None))
+        viz_data[k] = (text[last_index:], None)
+        k += 1
+    del viz_data[k:]
     return viz_data
 
 def create_length_plot(chunks):
-    lengths = [len(chunk) for chunk in chunks]
-    df = pd.DataFrame({"Chunk": [f"Chunk {i+1}" for i in range(len(lengths))], "Length": lengths})
-    return gr.BarPlot(value=df, x="Chunk", y="Length", title="청크별 길이 (글자 수)", min_width=300)
+    n = len(chunks)
+    lengths = np.fromiter(map(len, chunks), dtype=np.int32, count=n)
+    labels = np.char.add("Chunk ", np.arange(1, n + 1).astype(str))
+    return pd.DataFrame({"Chunk": labels, "Length": lengths})
 
 def explore_tokens(text):
     try:
-        encoding = tiktoken.get_encoding("cl100k_base")
+        encoding = _get_encoding()
         tokens = encoding.encode(text)
-        token_data = [f"[Token {i} | ID: {token_id}]: '{encoding.decode([token_id])}'" for i, token_id in enumerate(tokens)]
+        # 긴 입력은 앞부분 MAX_TOKENS_SHOWN개만 보여줍니다.
+        head = tokens[:MAX_TOKENS_SHOWN]
+        # 토큰별 decode 호출 대신 바이트 조각을 한 번에 가져옵니다.
+        byte_pieces = encoding.decode_tokens_bytes(head)
         header = f"""총 토큰 수: {len(tokens)}---"""
-        return header + "\n" + "\n".join(token_data)
+        # f-string 대신 C로 구현된 % 포맷을 map으로 적용합니다.
+        tmpl = "[Token %d | ID: %d]: %r".__mod__
+        pieces = (piece.decode('utf-8', 'replace') for piece in byte_pieces)
+        body = "\n".join(map(tmpl, zip(range(len(head)), head, pieces)))
+        if len(tokens) > MAX_TOKENS_SHOWN:
+            body += f"\n… (+{len(tokens) - MAX_TOKENS_SHOWN} more tokens)"
+        return header + "\n" + body
     except Exception as e:
         return f"토큰을 처리하는 중 오류 발생: {e}"
 
 # --- UI Helper Functions ---
 def process_file(file):
-    if file: return open(file.name, "r", encoding="utf-8").read()
-    return ""
+    return Path(file.name).read_text(encoding="utf-8") if file else ""
+
+def _dump_json_bytes(data):
+    # orjson이 있으면 C 구현으로 UTF-8 바이트를 바로 만들고, 없으면 표준 json으로 대체합니다.
+    # orjson은 2칸 들여쓰기만 지원하므로 표준 json도 indent=2로 맞춰 환경과 관계없이 같은 파일이 나오게 합니다.
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
 
 def save_session(input_text, output_text):
     if not input_text and not output_text: return None
-    session_data = {"input": input_text, "output": json.loads(output_text) if isinstance(output_text, str) else output_text}
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json', encoding='utf-8') as f:
-        json.dump(session_data, f, ensure_ascii=False, indent=4)
+    # gr.JSON은 이미 파싱된 값을 넘기므로 문자열/바이트일 때만 다시 파싱합니다.
+    payload = output_text if not isinstance(output_text, (str, bytes, bytearray)) else json.loads(output_text)
+    session_data = {"input": input_text, "output": payload}
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.json') as f:
+        f.write(_dump_json_bytes(session_data))
         return f.name
 
 def load_session(file):
@@ -129,7 +220,7 @@ def load_session(file):
     return "", None
 
 def update_description(splitter_name):
-    return SPLITTER_DESCRIPTIONS.get(splitter_name, "")
+    return _desc_get(splitter_name, "")
 
 # --- Gradio UI ---
 with gr.Blocks(theme=gr.themes.Soft()) as demo:
@@ -162,18 +253,18 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
             with gr.Tab("경계 시각화", id=1):
                 output_boundary_viz = gr.HighlightedText(label="청크 경계 하이라이트", interactive=True)
             with gr.Tab("길이 시각화", id=2):
-                output_length_plot = gr.BarPlot(label="청크 길이 그래프")
+                output_length_plot = gr.BarPlot(label="청크 길이 그래프", x="Chunk", y="Length", title="청크별 길이 (글자 수)", min_width=300)
             with gr.Tab("토크나이저 탐색기", id=3, visible=False) as tokenizer_tab:
                 output_tokenizer = gr.Textbox(label="토큰 분해 결과", lines=15, interactive=False)
 
     # --- Event Handlers ---
     def update_visibility_and_description(splitter):
         is_code = splitter == "CodeSplitter"
-        desc = SPLITTER_DESCRIPTIONS.get(splitter, "")
-        return gr.update(visible=is_code), desc
+        is_token = splitter == "TokenTextSplitter"
+        desc = _desc_get(splitter, "")
+        return gr.update(visible=is_code), desc, gr.update(visible=is_token)
 
-    splitter_name.change(update_visibility_and_description, inputs=splitter_name, outputs=[language, splitter_description], show_progress=False)
-    splitter_name.change(fn=lambda x: gr.update(visible=x=="TokenTextSplitter"), inputs=splitter_name, outputs=tokenizer_tab, show_progress=False)
+    splitter_name.change(update_visibility_and_description, inputs=splitter_name, outputs=[language, splitter_description, tokenizer_tab], show_progress=False)
 
     file_upload.upload(process_file, inputs=file_upload, outputs=input_text)
     session_load.upload(load_session, inputs=session_load, outputs=[input_text, output_json])
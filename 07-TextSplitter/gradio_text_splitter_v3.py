@@ -2,6 +2,8 @@
 import gradio as gr
 import json
 import tempfile
+from pathlib import Path
+from functools import lru_cache
 from langchain_text_splitters import (
     CharacterTextSplitter,
     RecursiveCharacterTextSplitter,
@@ -10,6 +12,10 @@ from langchain_text_splitters import (
     RecursiveJsonSplitter,
     TokenTextSplitter
 )
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # --- Data ---
 SPLITTER_CHOICES = [
@@ -33,35 +39,44 @@ SPLITTER_DESCRIPTIONS = {
 }
 
 # --- Core Functions ---
+@lru_cache(maxsize=32)
+def _make_splitter(splitter_name, chunk_size, chunk_overlap, language=None):
+    # 같은 설정의 스플리터는 다시 만들지 않고 재사용합니다. 선택된 스플리터만 생성됩니다.
+    match splitter_name:
+        case "CodeSplitter":
+            return RecursiveCharacterTextSplitter.from_language(
+                language=language, chunk_size=chunk_size, chunk_overlap=chunk_overlap
+            )
+        case "CharacterTextSplitter":
+            return CharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        case "RecursiveCharacterTextSplitter":
+            return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        case "TokenTextSplitter":
+            return TokenTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        case "MarkdownHeaderTextSplitter":
+            return MarkdownHeaderTextSplitter(
+                headers_to_split_on=[("#", "Header 1"),("##", "Header 2"),("###", "Header 3")]
+            )
+        case "HTMLHeaderTextSplitter":
+            return HTMLHeaderTextSplitter(
+                headers_to_split_on=[("h1", "Header 1"),("h2", "Header 2"),("h3", "Header 3")]
+            )
+        case "RecursiveJsonSplitter":
+            return RecursiveJsonSplitter(max_chunk_size=chunk_size)
+        case _:
+            return None
+
+# 스플리터는 결정적이므로 같은 (텍스트, 설정) 조합의 분할 결과를 재사용합니다.
+@lru_cache(maxsize=8)
 def split_text(text, splitter_name, chunk_size, chunk_overlap, language=None):
     try:
         if splitter_name == "CodeSplitter":
             if language:
-                splitter = RecursiveCharacterTextSplitter.from_language(
-                    language=language, chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                )
+                splitter = _make_splitter(splitter_name, chunk_size, chunk_overlap, language)
             else:
                 return "CodeSplitter를 사용하려면 언어를 선택해주세요."
         else:
-            splitter_map = {
-                "CharacterTextSplitter": CharacterTextSplitter(
-                    chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                ),
-                "RecursiveCharacterTextSplitter": RecursiveCharacterTextSplitter(
-                    chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                ),
-                "TokenTextSplitter": TokenTextSplitter(
-                    chunk_size=chunk_size, chunk_overlap=chunk_overlap
-                ),
-                "MarkdownHeaderTextSplitter": MarkdownHeaderTextSplitter(
-                    headers_to_split_on=[("#", "Header 1"),("##", "Header 2"),("###", "Header 3")]
-                ),
-                "HTMLHeaderTextSplitter": HTMLHeaderTextSplitter(
-                    headers_to_split_on=[("h1", "Header 1"),("h2", "Header 2"),("h3", "Header 3")]
-                ),
-                "RecursiveJsonSplitter": RecursiveJsonSplitter(max_chunk_size=chunk_size),
-            }
-            splitter = splitter_map.get(splitter_name)
+            splitter = _make_splitter(splitter_name, chunk_size, chunk_overlap)
 
         if splitter is None:
             return "잘못된 스플리터를 선택했습니다."
@@ -77,39 +92,46 @@ def get_example_text(splitter_name):
     return SPLITTER_DESCRIPTIONS.get(splitter_name, "")
 
 def process_file(file):
-    if file is not None:
-        with open(file.name, "r", encoding="utf-8") as f: return f.read()
-    return ""
+    return Path(file.name).read_text(encoding="utf-8") if file else ""
+
+def _dump_json_bytes(data):
+    # orjson이 있으면 C 구현으로 UTF-8 바이트를 바로 만들고, 없으면 표준 json으로 대체합니다.
+    # orjson은 2칸 들여쓰기만 지원하므로 표준 json도 indent=2로 맞춰 환경과 관계없이 같은 파일이 나오게 합니다.
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
 
 def save_session_json(input_text, output_text):
     if not input_text and not output_text: return None
     session_data = {"input": input_text, "output": output_text}
-    with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.json', encoding='utf-8') as f:
-        json.dump(session_data, f, ensure_ascii=False, indent=4)
+    with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.json') as f:
+        f.write(_dump_json_bytes(session_data))
         return f.name
 
 def save_session_md(input_text, output_text):
     if not input_text and not output_text: return None
     
-    md_content = "## 원본 데이터 Input Data\n\n"
-    md_content += f"```\n{input_text}\n```\n\n"
-    md_content += "\n---\n\n"
-    md_content += "## 분할된 청크 Output Data\n\n"
+    parts = [
+        "## 원본 데이터 Input Data\n\n",
+        f"```\n{input_text}\n```\n\n",
+        "\n---\n\n",
+        "## 분할된 청크 Output Data\n\n",
+    ]
 
     if output_text:
         for i, chunk in enumerate(output_text):
-            md_content += f"### Chunk {i+1}\n\n"
+            parts.append(f"### Chunk {i+1}\n\n")
             # Check if chunk is a dictionary (from MarkdownHeaderTextSplitter)
             if isinstance(chunk, dict) and 'page_content' in chunk:
-                md_content += f"**Metadata:** `{chunk.get('metadata', {})}`\n\n"
-                md_content += f"```\n{chunk['page_content']}\n```\n\n"
+                parts.append(f"**Metadata:** `{chunk.get('metadata', {})}`\n\n")
+                parts.append(f"```\n{chunk['page_content']}\n```\n\n")
             else: # Assuming it's a simple string
-                md_content += f"```\n{chunk}\n```\n\n"
-            md_content += "---"
+                parts.append(f"```\n{chunk}\n```\n\n")
+            parts.append("---")
 
 
     with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.md', encoding='utf-8') as f:
-        f.write(md_content)
+        f.write("".join(parts))
         return f.name
 
 def load_session(file):
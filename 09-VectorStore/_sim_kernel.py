@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""직접 계산 경로에서 사용하는 Numba JIT 코사인 유사도 커널"""
+import numpy as np
+from numba import njit, prange
+
+
+@njit(parallel=True, fastmath=True, cache=True)
+def cosine_sim(q, docs):
+    """쿼리 벡터 q와 문서 행렬 docs의 각 행 사이의 코사인 유사도를 계산합니다."""
+    out = np.empty(docs.shape[0], dtype=np.float32)
+    qn = np.sqrt(q.dot(q))
+    for i in prange(docs.shape[0]):
+        d = docs[i]
+        out[i] = d.dot(q) / (np.sqrt(d.dot(d)) * qn)
+    return out
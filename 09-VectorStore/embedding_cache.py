@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""문장 임베딩 디스크 캐시
+
+(모델, 전처리 옵션) 조합마다 `<cache_dir>/emb/<해시>/` 디렉터리를 두고,
+새로 계산한 임베딩 배치를 .npz 샤드 파일 하나로 추가 저장합니다.
+샤드에는 문장 해시(keys)와 float32 임베딩 벡터(vecs)가 들어 있습니다.
+"""
+import hashlib
+import os
+import tempfile
+import threading
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+# 이미 읽어 들인 캐시 디렉터리: 경로 -> {문장 해시: 벡터}
+_LOADED = {}
+# Vector Store 생성과 유사도 계산이 동시에 실행될 수 있으므로 캐시 접근을 직렬화
+_LOCK = threading.Lock()
+
+
+def _options_key(model_name, options):
+    return model_name + "|" + "|".join(sorted(options))
+
+
+def _cache_dir(cache_dir, model_name, options):
+    name = hashlib.sha1(_options_key(model_name, options).encode()).hexdigest()
+    return Path(cache_dir) / "emb" / name
+
+
+def _text_key(model_name, options, text):
+    return hashlib.sha1((_options_key(model_name, options) + "|" + text).encode()).hexdigest()
+
+
+def _load(path):
+    if path not in _LOADED:
+        entries = {}
+        for shard in sorted(path.glob("*.npz")):
+            with np.load(shard) as f:
+                entries.update(zip(f["keys"].tolist(), f["vecs"]))
+        _LOADED[path] = entries
+    return _LOADED[path]
+
+
+def get_cached(cache_dir, model_name, options, texts):
+    """캐시에 있는 임베딩({문장: 벡터})과 아직 임베딩되지 않은 문장 목록을 반환합니다."""
+    with _LOCK:
+        entries = _load(_cache_dir(cache_dir, model_name, options))
+        cached = {}
+        missing = []
+        for text in dict.fromkeys(texts):
+            vec = entries.get(_text_key(model_name, options, text))
+            if vec is None:
+                missing.append(text)
+            else:
+                cached[text] = vec
+    return cached, missing
+
+
+def put_cached(cache_dir, model_name, options, texts, vecs):
+    """새로 계산한 임베딩을 캐시에 추가하고, 새 항목만 샤드 파일 하나로 저장합니다."""
+    path = _cache_dir(cache_dir, model_name, options)
+    keys = [_text_key(model_name, options, text) for text in texts]
+    vecs = np.asarray(vecs, dtype=np.float32)
+    if not keys:
+        return
+
+    with _LOCK:
+        _load(path).update(zip(keys, vecs))
+
+    # 샤드마다 고유한 이름의 임시 파일에 쓴 뒤 rename하므로 동시에 저장해도 파일이 섞이지 않음
+    path.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path, suffix=".tmp", delete=False) as f:
+        np.savez(f, keys=np.array(keys), vecs=vecs)
+    os.replace(f.name, path / f"{uuid.uuid4().hex}.npz")
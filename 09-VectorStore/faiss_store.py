@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""FAISS IndexFlatIP 기반의 소규모 코퍼스용 Vector Store
+
+정규화된 벡터에 대한 내적(= 코사인 유사도)을 전수 비교하므로 결과가 정확하며,
+수만 건 이하의 코퍼스에서는 HNSW 인덱스보다 빌드/검색 비용이 작습니다.
+"""
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+INDEX_FILE = "index.faiss"
+DOCS_FILE = "docs.json"
+
+
+class FaissFlatStore:
+    """`similarity_search_with_score`를 Chroma(cosine)와 같은 형태로 제공하는 FAISS 저장소"""
+
+    def __init__(self, index, entries, query_embedder):
+        self.index = index
+        self.entries = entries
+        self.query_embedder = query_embedder
+
+    @classmethod
+    def build(cls, texts, categories, vecs, query_embedder, path):
+        """문서 벡터로 인덱스를 생성하고 `path`에 저장합니다."""
+        vecs = np.ascontiguousarray(vecs, dtype=np.float32)
+        faiss.normalize_L2(vecs)
+        index = faiss.IndexFlatIP(vecs.shape[1])
+        index.add(vecs)
+
+        entries = [{"text": t, "category": c} for t, c in zip(texts, categories)]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # 임시 디렉터리에 모두 쓴 뒤 rename하여, 저장 중 실패해도 불완전한 `path`가 남지 않게 함
+        tmp_dir = Path(tempfile.mkdtemp(dir=path.parent, prefix=path.name + ".tmp-"))
+        try:
+            faiss.write_index(index, str(tmp_dir / INDEX_FILE))
+            with open(tmp_dir / DOCS_FILE, "w", encoding="utf-8") as f:
+                json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_dir, path)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return cls(index, entries, query_embedder)
+
+    @classmethod
+    def load(cls, path, query_embedder):
+        """`path`에 저장된 인덱스와 문서 정보를 불러옵니다."""
+        path = Path(path)
+        index = faiss.read_index(str(path / INDEX_FILE))
+        with open(path / DOCS_FILE, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        return cls(index, entries, query_embedder)
+
+    def similarity_search_with_score(self, query, k=4):
+        """(Document, 코사인 거리) 목록을 유사도 내림차순으로 반환합니다."""
+        return self.similarity_search_by_vector_with_relevance_scores(
+            self.query_embedder.embed_query(query), k=k
+        )
+
+    def similarity_search_by_vector_with_relevance_scores(self, embedding, k=4):
+        """이미 계산된 쿼리 벡터로 검색하여 (Document, 코사인 거리) 목록을 반환합니다."""
+        q = np.asarray([embedding], dtype=np.float32)
+        faiss.normalize_L2(q)
+        scores, ids = self.index.search(q, k)
+        results = []
+        for score, idx in zip(scores[0], ids[0]):
+            if idx == -1:
+                continue
+            entry = self.entries[idx]
+            doc = Document(page_content=entry["text"], metadata={"category": entry["category"]})
+            results.append((doc, 1.0 - float(score)))
+        return results
@@ -6,19 +6,37 @@ import gradio as gr
 import numpy as np
 import os
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import normalize
 import re
 import matplotlib.pyplot as plt
 import fitz  # PyMuPDF
 import warnings
 import hashlib
 import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores.chroma import Chroma
-from langchain_core.documents import Document
+
+from embedding_cache import get_cached, put_cached
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import simsimd
+except ImportError:
+    simsimd = None
+
+try:
+    from _sim_kernel import cosine_sim
+except ImportError:
+    cosine_sim = None
 
 # Suppress specific warnings
 warnings.filterwarnings("ignore", category=UserWarning, module='gradio.components.dropdown')
@@ -62,64 +80,124 @@ def get_sample_data():
         {"category": "건강", "text": "A balanced diet is key to good health."},
     ]
 
+def extract_pdf_pages(file_path):
+    """PDF의 페이지별 텍스트 리스트를 반환합니다."""
+    # PyMuPDF는 멀티스레드를 지원하지 않으므로 한 스레드에서 순서대로 추출합니다.
+    with fitz.open(file_path) as doc:
+        return [page.get_text("text") for page in doc]
+
 def load_sentences(source_type, file_obj, use_chunking, chunk_size, chunk_overlap):
     """데이터 소스 타입에 따라 문장 리스트를 로드합니다."""
     if source_type == "내장 샘플":
-        return get_sample_data()
+        return _load_sentences_cached(source_type, None, None, use_chunking, chunk_size, chunk_overlap)
     if file_obj is None:
         gr.Warning("파일을 업로드해주세요.")
         return []
 
     file_path = file_obj.name
     _, file_extension = os.path.splitext(file_path)
-    
-    raw_text = ""
-    try:
-        if file_extension.lower() == ".pdf":
-            doc = fitz.open(file_path)
-            for page in doc:
-                raw_text += page.get_text("text") + "\n"
-            doc.close()
-        elif file_extension.lower() == ".csv":
-            # CSV는 청킹 대상이 아니므로 기존 로직 유지
-            df = pd.read_csv(file_path)
-            sentences = []
-            for _, row in df.iterrows():
-                if 'text_kr' in row and pd.notna(row['text_kr']):
-                    sentences.append({"category": row.get('category', 'CSV'), "text": row['text_kr']})
-                if 'text_en' in row and pd.notna(row['text_en']):
-                    sentences.append({"category": row.get('category', 'CSV'), "text": row['text_en']})
-            return sentences
-        else:
-            gr.Warning(f"지원하지 않는 파일 형식입니다: {file_extension}")
-            return []
-
-        # PDF 또는 다른 텍스트 파일에 대한 청킹 처리
-        if use_chunking and raw_text and source_type == "PDF 업로드":
-            text_splitter = RecursiveCharacterTextSplitter(
-                chunk_size=chunk_size,
-                chunk_overlap=chunk_overlap
-            )
-            chunks = text_splitter.split_text(raw_text)
-            return [{"category": "PDF-Chunked", "text": chunk} for chunk in chunks if chunk.strip()]
-        elif raw_text:
-            # 청킹 사용 안 할 경우, 기존처럼 줄바꿈으로 분리
-            lines = raw_text.split('\n')
-            return [{"category": "PDF", "text": line.strip()} for line in lines if line.strip()]
-        else:
-            return []
+    if file_extension.lower() not in (".pdf", ".csv"):
+        gr.Warning(f"지원하지 않는 파일 형식입니다: {file_extension}")
+        return []
 
+    # 같은 파일(경로 + 수정 시각)과 청킹 설정이면 파싱 결과를 재사용
+    # (예외는 캐시되지 않으므로 실패한 파일은 다음 호출에서 다시 읽음)
+    try:
+        return _load_sentences_cached(
+            source_type, file_path, os.path.getmtime(file_path), use_chunking, chunk_size, chunk_overlap
+        )
     except Exception as e:
         gr.Error(f"파일 처리 중 오류 발생: {e}")
         return []
 
+@lru_cache(maxsize=8)
+def _load_sentences_cached(source_type, file_path, mtime, use_chunking, chunk_size, chunk_overlap):
+    """파일을 읽어 문장 리스트를 만듭니다. (load_sentences의 캐시 대상 본체, 실패 시 예외 발생)"""
+    if source_type == "내장 샘플":
+        return get_sample_data()
+
+    _, file_extension = os.path.splitext(file_path)
+    
+    page_texts = []
+    if file_extension.lower() == ".pdf":
+        page_texts = extract_pdf_pages(file_path)
+    elif file_extension.lower() == ".csv":
+        # CSV는 청킹 대상이 아니므로 기존 로직 유지
+        df = pd.read_csv(file_path)
+        categories = df['category'] if 'category' in df.columns else pd.Series('CSV', index=df.index)
+        parts = [
+            pd.DataFrame({"category": categories, "text": df[col]}).dropna(subset=["text"])
+            for col in ("text_kr", "text_en") if col in df.columns
+        ]
+        if not parts:
+            return []
+        # 행마다 한국어 → 영어 순서를 유지하도록 원래 인덱스로 안정 정렬
+        merged = pd.concat(parts).sort_index(kind="stable")
+        merged['category'] = merged['category'].fillna('CSV')
+        return merged.to_dict('records')
+
+    # PDF 또는 다른 텍스트 파일에 대한 청킹 처리
+    # 전체 텍스트를 하나로 이어 붙이지 않고 페이지 단위로 분할하며, 각 청크에 페이지 번호를 남김
+    if use_chunking and page_texts and source_type == "PDF 업로드":
+        text_splitter = RecursiveCharacterTextSplitter(
+            chunk_size=chunk_size,
+            chunk_overlap=chunk_overlap
+        )
+        docs = text_splitter.create_documents(
+            page_texts, metadatas=[{"page": i} for i in range(len(page_texts))]
+        )
+        return [
+            {"category": "PDF-Chunked", "text": doc.page_content, "page": doc.metadata["page"]}
+            for doc in docs if doc.page_content.strip()
+        ]
+    elif page_texts:
+        # 청킹 사용 안 할 경우, 기존처럼 줄바꿈으로 분리
+        return [
+            {"category": "PDF", "text": line.strip(), "page": i}
+            for i, page_text in enumerate(page_texts)
+            for line in page_text.split('\n') if line.strip()
+        ]
+    else:
+        return []
+
 
 # --- 2. 임베딩 모델 로더 ---
+# 모델 이름별로 생성한 임베딩 객체 (HF 모델을 매번 디스크에서 다시 로드하지 않도록)
+_EMBEDDER_CACHE = {}
+# 로컬에서 실행되는 모델 (네트워크 왕복이 없으므로 동시 배치 요청을 하지 않음)
+LOCAL_EMBEDDING_MODELS = {"HuggingFace (multilingual-e5-large-instruct)"}
+
 def get_embedder(model_name):
     """선택된 모델에 대한 임베딩 함수/객체를 반환합니다."""
+    if model_name in _EMBEDDER_CACHE:
+        return _EMBEDDER_CACHE[model_name]
+    embedder = _create_embedder(model_name)
+    if embedder is not None:
+        _EMBEDDER_CACHE[model_name] = embedder
+    return embedder
+
+def _create_embedder(model_name):
+    """선택된 모델에 대한 임베딩 객체를 새로 생성합니다."""
     if model_name == "HuggingFace (multilingual-e5-large-instruct)":
+        import torch
         from langchain_community.embeddings import HuggingFaceEmbeddings
-        return HuggingFaceEmbeddings(model_name="intfloat/multilingual-e5-large-instruct")
+        use_cuda = torch.cuda.is_available()
+        model_kwargs = {"device": "cuda" if use_cuda else "cpu"}
+        if use_cuda:
+            # GPU에서는 fp16 가중치로 텐서 코어를 사용
+            model_kwargs["model_kwargs"] = {"torch_dtype": torch.float16}
+        embedder = HuggingFaceEmbeddings(
+            model_name="intfloat/multilingual-e5-large-instruct",
+            model_kwargs=model_kwargs,
+            encode_kwargs={
+                "batch_size": 128 if use_cuda else 64,
+                "normalize_embeddings": True,
+                "convert_to_numpy": True
+            }
+        )
+        # autograd 기록 없이 추론하도록 SentenceTransformer.encode를 inference_mode로 감쌈
+        embedder.client.encode = torch.inference_mode()(embedder.client.encode)
+        return embedder
 
     elif model_name == "OpenAI (text-embedding-3-small)":
         if not os.environ.get("OPENAI_API_KEY"):
@@ -146,15 +224,49 @@ def get_embedder(model_name):
         gr.Error("알 수 없는 모델입니다.")
         return None
 
+def embed_in_parallel(embedder, texts, batch_size=64, max_inflight=4):
+    """문장들을 배치로 나누어 동시에 임베딩하고, 입력 순서대로 결과를 반환합니다."""
+    if len(texts) <= batch_size:
+        return embedder.embed_documents(texts)
+
+    results = [None] * len(texts)
+
+    def embed_batch(start):
+        # 동시에 요청이 몰려 rate limit에 걸리지 않도록 시작 시점을 조금씩 분산
+        time.sleep(random.uniform(0, 0.05))
+        return start, embedder.embed_documents(texts[start:start + batch_size])
+
+    with ThreadPoolExecutor(max_workers=max_inflight) as executor:
+        futures = [executor.submit(embed_batch, i) for i in range(0, len(texts), batch_size)]
+        for future in as_completed(futures):
+            start, vecs = future.result()
+            results[start:start + len(vecs)] = vecs
+    return results
+
+@lru_cache(maxsize=512)
+def _embed_query_cached(model_name, opts_tuple, text):
+    """전처리된 쿼리의 임베딩을 (모델, 전처리 옵션, 쿼리) 단위로 캐시합니다."""
+    emb = get_embedder(model_name)
+    if emb is None:
+        raise ValueError(f"{model_name} 모델을 불러올 수 없습니다. API 키 등을 확인해주세요.")
+    query_embedder = emb[0] if isinstance(emb, tuple) else emb
+    return tuple(query_embedder.embed_query(text))
+
 # --- 3. Vector Store 및 유사도 계산 ---
 
 CACHE_DIR = Path("./vs_cache")
 
 def get_config_hash(config):
     """설정 딕셔너리로부터 고유한 해시 값을 생성합니다."""
-    # 순서에 상관없이 동일한 해시를 얻기 위해 딕셔너리를 정렬된 JSON 문자열로 변환
-    serialized_config = json.dumps(config, sort_keys=True)
-    return hashlib.sha1(serialized_config.encode()).hexdigest()
+    # 순서에 상관없이 동일한 해시를 얻기 위해 딕셔너리를 키 정렬된 JSON 바이트로 변환
+    # (orjson 유무와 관계없이 같은 바이트열이 나오도록 표준 json은 compact/UTF-8로 맞춤)
+    if orjson is not None:
+        serialized_config = orjson.dumps(config, option=orjson.OPT_SORT_KEYS)
+    else:
+        serialized_config = json.dumps(
+            config, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+    return hashlib.blake2b(serialized_config, digest_size=16).hexdigest()
 
 def get_db_path(file_name, model_name, preprocess_options, use_chunking, chunk_size, chunk_overlap):
     """설정 값들을 기반으로 DB 저장 경로를 생성합니다."""
@@ -172,18 +284,153 @@ def get_db_path(file_name, model_name, preprocess_options, use_chunking, chunk_s
     config_hash = get_config_hash(config)
     return CACHE_DIR / config_hash
 
+_RE_PUNCT = re.compile(r'[^\w\s]')
+_RE_WS = re.compile(r'\s+')
+
 def preprocess_text(text, options):
     """텍스트 전처리 옵션을 적용합니다."""
     if "소문자화" in options:
         text = text.lower()
     if "숫자/기호 제거" in options:
-        text = re.sub(r'[^\w\s]', '', text)
+        text = _RE_PUNCT.sub('', text)
     if "중복 공백 정리" in options:
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _RE_WS.sub(' ', text).strip()
     return text
 
+def preprocess_texts(texts, options):
+    """문장 리스트 전체에 전처리 옵션을 한 번에 적용합니다."""
+    s = pd.Series(texts, dtype=object)
+    if "소문자화" in options:
+        s = s.str.lower()
+    if "숫자/기호 제거" in options:
+        s = s.str.replace(_RE_PUNCT, '', regex=True)
+    if "중복 공백 정리" in options:
+        s = s.str.replace(_RE_WS, ' ', regex=True).str.strip()
+    return s.tolist()
+
+def cosine_scores(query_vec, doc_vecs):
+    """쿼리 벡터와 문서 벡터들 사이의 코사인 유사도 배열을 반환합니다."""
+    q = np.asarray(query_vec, dtype=np.float32).reshape(1, -1)
+    docs = np.ascontiguousarray(doc_vecs, dtype=np.float32)
+    if simsimd is not None:
+        # SIMD 커널에서 norm과 dot을 한 번에 계산
+        return 1.0 - np.asarray(simsimd.cdist(q, docs, metric="cosine")).ravel()
+    q = q[0]
+    if cosine_sim is not None:
+        # Numba 병렬 커널 (첫 호출 시 컴파일, 이후 디스크 캐시 사용)
+        return cosine_sim(q, docs)
+    # 쿼리만 한 번 정규화하고, 문서 norm으로 나누는 단일 BLAS gemv
+    q = q / np.sqrt(q.dot(q))
+    norms = np.sqrt(np.einsum('ij,ij->i', docs, docs))
+    return (docs @ q) / norms
+
+
+def quantize_int8(vecs):
+    """벡터를 L2 정규화한 뒤 [-127, 127] 범위의 int8로 양자화합니다."""
+    vecs = np.asarray(vecs, dtype=np.float32)
+    norms = np.linalg.norm(vecs, axis=-1, keepdims=True)
+    unit = vecs / np.maximum(norms, 1e-12)
+    return np.clip(np.round(unit * 127.0), -127, 127).astype(np.int8)
+
+
+def cosine_scores_int8(query_i8, docs_i8):
+    """int8로 양자화된 쿼리/문서 벡터 사이의 코사인 유사도 배열을 반환합니다. (simsimd 필요)"""
+    return 1.0 - np.asarray(simsimd.cdist(query_i8.reshape(1, -1), docs_i8, metric="cosine")).ravel()
+
+
+def embed_with_cache(passage_embedder, model_name, preprocess_options, texts, query=None):
+    """디스크 캐시에 없는 문장만 임베딩하여, (texts 순서의 float32 행렬, 쿼리 벡터)를 반환합니다.
+
+    query가 주어지고 새로 임베딩할 문장이 있으면 쿼리를 같은 배치 맨 앞에 붙여 함께 임베딩합니다.
+    그렇지 않으면 쿼리 벡터는 None입니다.
+    """
+    cached, missing = get_cached(CACHE_DIR, model_name, preprocess_options, texts)
+    query_vec = None
+    if missing:
+        batch = missing if query is None else [query] + missing
+        if model_name in LOCAL_EMBEDDING_MODELS:
+            # 로컬 모델은 encode_kwargs의 batch_size로 한 번에 임베딩 (스레드 동시 호출은 GPU/CPU 경합만 유발)
+            new_vecs = passage_embedder.embed_documents(batch)
+        else:
+            # 원격 API는 배치를 동시에 요청해 네트워크 왕복 시간을 숨김
+            new_vecs = embed_in_parallel(passage_embedder, batch)
+        new_vecs = np.asarray(new_vecs, dtype=np.float32)
+        if query is not None:
+            query_vec, new_vecs = new_vecs[0], new_vecs[1:]
+        put_cached(CACHE_DIR, model_name, preprocess_options, missing, new_vecs)
+        cached.update(zip(missing, new_vecs))
+    return np.stack([cached[t] for t in texts]).astype(np.float32, copy=False), query_vec
+
+
+def add_to_collection(collection, ids, vecs, texts, metadatas, batch_size=5000):
+    """미리 계산된 임베딩을 Chroma 컬렉션에 배치 단위로 추가합니다."""
+    for i in range(0, len(ids), batch_size):
+        collection.add(
+            ids=ids[i:i + batch_size],
+            embeddings=vecs[i:i + batch_size].tolist(),
+            documents=texts[i:i + batch_size],
+            metadatas=metadatas[i:i + batch_size]
+        )
+
 
-def calculate_similarity(query, data, model_name, top_k, threshold, preprocess_options):
+CORPUS_VECS_FILE = "vecs.npy"
+CORPUS_META_FILE = "meta.parquet"
+CORPUS_SOURCE_FILE = "source.json"
+
+def get_source_signature(source_type, file_obj):
+    """데이터 소스 식별 정보를 반환합니다. 업로드 파일은 (소스 타입, 수정 시각, 크기)를 사용합니다."""
+    # 소스 선택을 바꿔도 업로더 값은 남아 있으므로, 업로드 타입일 때만 파일 정보를 사용
+    if source_type == "내장 샘플" or file_obj is None:
+        return [source_type]
+    stat = os.stat(file_obj.name)
+    return [source_type, stat.st_mtime, stat.st_size]
+
+def save_corpus_matrix(db_path, vecs, sentences, categories, source_signature):
+    """Vector Store 디렉터리에 문서 임베딩 행렬(.npy)과 문장/카테고리(.parquet), 원본 파일 정보를 저장합니다."""
+    db_path = Path(db_path)
+    db_path.mkdir(parents=True, exist_ok=True)
+    np.save(db_path / CORPUS_VECS_FILE, np.asarray(vecs, dtype=np.float32))
+    pd.DataFrame({"text": sentences, "category": categories}).to_parquet(db_path / CORPUS_META_FILE)
+    # 원본 파일 정보는 마지막에 기록해, 저장이 중간에 실패한 행렬은 사용되지 않도록 함
+    with open(db_path / CORPUS_SOURCE_FILE, "w", encoding="utf-8") as f:
+        json.dump({"source": source_signature}, f)
+
+def load_corpus_matrix(db_path, source_signature):
+    """저장된 (문장 데이터, mmap 임베딩 행렬)을 반환합니다.
+
+    저장된 행렬이 없거나, 같은 이름의 다른 파일(수정 시각/크기가 다름)로 만든 것이면 (None, None)을 반환합니다.
+    """
+    db_path = Path(db_path)
+    vecs_path = db_path / CORPUS_VECS_FILE
+    source_path = db_path / CORPUS_SOURCE_FILE
+    if not (vecs_path.exists() and (db_path / CORPUS_META_FILE).exists() and source_path.exists()):
+        return None, None
+    with open(source_path, "r", encoding="utf-8") as f:
+        if json.load(f).get("source") != source_signature:
+            return None, None
+    return _load_corpus_matrix_cached(str(db_path), os.path.getmtime(vecs_path))
+
+@lru_cache(maxsize=4)
+def _load_corpus_matrix_cached(db_path, mtime):
+    db_path = Path(db_path)
+    # mmap으로 열어 유사도 계산 시 필요한 페이지만 OS가 읽어 들이도록 함
+    vecs = np.load(db_path / CORPUS_VECS_FILE, mmap_mode='r')
+    data = pd.read_parquet(db_path / CORPUS_META_FILE).to_dict('records')
+    return data, vecs
+
+# 직접 계산 경로의 전처리/임베딩 결과: cache_key -> (data, 전처리된 문장, 문서 벡터, int8 문서 벡터)
+_PREPROCESSED_CACHE = {}
+_PREPROCESSED_CACHE_SIZE = 8
+
+def _remember(cache_key, entry):
+    """직접 계산 결과를 캐시에 저장합니다. 새 키일 때만 가장 오래된 항목을 내보냅니다."""
+    if cache_key is None:
+        return
+    if cache_key not in _PREPROCESSED_CACHE and len(_PREPROCESSED_CACHE) >= _PREPROCESSED_CACHE_SIZE:
+        _PREPROCESSED_CACHE.pop(next(iter(_PREPROCESSED_CACHE)))
+    _PREPROCESSED_CACHE[cache_key] = entry
+
+def calculate_similarity(query, data, model_name, top_k, threshold, preprocess_options, cache_key=None, use_int8=False, precomputed_vecs=None):
     """유사도 계산의 메인 로직"""
     if not query:
         gr.Warning("기준 문장을 입력해주세요.")
@@ -202,17 +449,34 @@ def calculate_similarity(query, data, model_name, top_k, threshold, preprocess_o
 
     processed_query = preprocess_text(query, preprocess_options)
     sentences = [item['text'] for item in data]
-    processed_sentences = [preprocess_text(s, preprocess_options) for s in sentences]
+    # 같은 데이터 객체에 대해 이미 계산한 결과가 있으면 쿼리만 임베딩
+    entry = _PREPROCESSED_CACHE.get(cache_key)
+    if entry is not None and entry[0] is data:
+        _, processed_sentences, doc_vecs, doc_vecs_i8 = entry
+    elif precomputed_vecs is not None:
+        # Vector Store 생성 시 저장해 둔 행렬 사용 (문서 임베딩 생략)
+        processed_sentences, doc_vecs, doc_vecs_i8 = None, precomputed_vecs, None
+        _remember(cache_key, (data, processed_sentences, doc_vecs, None))
+    else:
+        processed_sentences = preprocess_texts(sentences, preprocess_options)
+        doc_vecs = doc_vecs_i8 = None
 
     try:
-        # Upstage 모델의 경우 (query, passage) 튜플로 반환됨
-        if isinstance(embedder, tuple):
-            query_embedder, passage_embedder = embedder
-            query_vec = query_embedder.embed_query(processed_query)
-            doc_vecs = passage_embedder.embed_documents(processed_sentences)
-        else: # 그 외 모델
-            query_vec = embedder.embed_query(processed_query)
-            doc_vecs = embedder.embed_documents(processed_sentences)
+        # Upstage 모델의 경우 (query, passage) 튜플로 반환됨 (쿼리는 _embed_query_cached에서 임베딩)
+        passage_embedder = embedder[1] if isinstance(embedder, tuple) else embedder
+        query_vec = None
+        if doc_vecs is None:
+            # 질문/문서 모델이 같으면(HF, Ollama, OpenAI) 쿼리를 문서 배치에 합쳐 한 번에 임베딩
+            shared_query = None if isinstance(embedder, tuple) else processed_query
+            doc_vecs, query_vec = embed_with_cache(
+                passage_embedder, model_name, preprocess_options, processed_sentences, query=shared_query
+            )
+            _remember(cache_key, (data, processed_sentences, doc_vecs, None))
+
+        if query_vec is None:
+            query_vec = np.asarray(
+                _embed_query_cached(model_name, tuple(sorted(preprocess_options)), processed_query), dtype=np.float32
+            )
     except Exception as e:
         error_message = f"임베딩 생성 중 오류: {e}"
         if "Connection refused" in str(e) and "Ollama" in model_name:
@@ -220,24 +484,32 @@ def calculate_similarity(query, data, model_name, top_k, threshold, preprocess_o
         gr.Error(error_message)
         return pd.DataFrame(), None, error_message
 
-    query_vec_normalized = normalize([query_vec], norm='l2')[0]
-    doc_vecs_normalized = normalize(doc_vecs, norm='l2')
-    sim_matrix = cosine_similarity([query_vec_normalized], doc_vecs_normalized)[0]
+    if use_int8 and simsimd is not None:
+        # 양자화된 문서 행렬은 한 번 만들어 두고 재사용 (메모리 4배 절감, 정확도 약간 손실)
+        if doc_vecs_i8 is None:
+            doc_vecs_i8 = quantize_int8(doc_vecs)
+            if cache_key in _PREPROCESSED_CACHE:
+                _PREPROCESSED_CACHE[cache_key] = _PREPROCESSED_CACHE[cache_key][:3] + (doc_vecs_i8,)
+        sim_matrix = cosine_scores_int8(quantize_int8(query_vec), doc_vecs_i8)
+    else:
+        sim_matrix = cosine_scores(query_vec, doc_vecs)
 
-    results = []
-    for i, score in enumerate(sim_matrix):
-        if score >= threshold:
-            results.append({
-                "유사도": score,
-                "문장": sentences[i],
-                "카테고리": data[i]['category']
-            })
+    # 전체 정렬 대신 상위 k개만 골라 정렬한 뒤 임계치로 거름: O(N + k log k)
+    sim_matrix = np.asarray(sim_matrix)
+    k = min(int(top_k), sim_matrix.size)
+    top_idx = np.argpartition(sim_matrix, -k)[-k:]
+    top_idx = top_idx[np.argsort(-sim_matrix[top_idx])]
+    top_idx = top_idx[sim_matrix[top_idx] >= threshold]
 
-    if not results:
+    if top_idx.size == 0:
         summary_message = f"유사도 임계치({threshold})를 넘는 문장을 찾지 못했습니다. 임계치를 낮추거나 다른 모델을 사용해 보세요."
         return pd.DataFrame(), None, summary_message
 
-    df = pd.DataFrame(results).sort_values(by="유사도", ascending=False).head(top_k)
+    df = pd.DataFrame({
+        "유사도": sim_matrix[top_idx],
+        "문장": [sentences[i] for i in top_idx],
+        "카테고리": [data[i]['category'] for i in top_idx]
+    })
     if not df.empty:
         df.insert(0, "순위", range(1, len(df) + 1))
         df['유사도'] = df['유사도'].map('{:.4f}'.format)
@@ -324,13 +596,19 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
 
             with gr.Accordion("4. 검색 방식 및 파라미터 설정", open=True):
                 backend_selector = gr.Radio(
-                    ["직접 계산 (기존 방식)", "ChromaDB Vector Store"],
+                    ["직접 계산 (기존 방식)", "ChromaDB Vector Store", "FAISS Flat IP"],
                     label="백엔드 선택",
                     value="ChromaDB Vector Store"
                 )
                 with gr.Row():
                     top_k_slider = gr.Slider(1, 20, value=10, step=1, label="Top-K")
                     threshold_slider = gr.Slider(0, 1, value=0.2, step=0.05, label="유사도 임계치 (직접 계산 전용)")
+                # int8 내적은 simsimd가 있어야 float32 경로보다 빠르므로 없으면 옵션을 숨김
+                int8_checkbox = gr.Checkbox(
+                    label="int8 양자화로 빠르게 계산 (직접 계산 전용, 정확도 약간 손실)",
+                    value=False,
+                    visible=simsimd is not None
+                )
 
             with gr.Accordion("5. Vector Store 관리", open=True):
                 vs_status_textbox = gr.Textbox(label="Vector Store 상태", interactive=False)
@@ -356,7 +634,7 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
 
     # --- 5. 이벤트 핸들러 및 실행 로직 ---
 
-    def create_or_load_vector_store(source_type, file_obj, model_name, preprocess_options, use_chunking, chunk_size, chunk_overlap):
+    def create_or_load_vector_store(backend, source_type, file_obj, model_name, preprocess_options, use_chunking, chunk_size, chunk_overlap):
         """Vector Store를 생성하거나 로드합니다."""
         if (source_type == "PDF 업로드" or source_type == "CSV 업로드") and file_obj is None:
             gr.Warning(f"{source_type}를 선택했지만 파일이 업로드되지 않았습니다.")
@@ -365,15 +643,27 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
         file_name = os.path.basename(file_obj.name) if file_obj else "내장 샘플"
 
         db_path = get_db_path(file_name, model_name, preprocess_options, use_chunking, chunk_size, chunk_overlap)
+        use_faiss = backend == "FAISS Flat IP"
+        if use_faiss:
+            from faiss_store import FaissFlatStore
+            db_path = db_path.with_name(db_path.name + "-faiss")
 
         embedder = get_embedder(model_name)
         if embedder is None:
             gr.Error(f"{model_name} 모델을 불러올 수 없습니다. API 키 등을 확인해주세요.")
             return None, "오류: 임베딩 모델 로딩 실패"
+        query_embedder, passage_embedder = embedder if isinstance(embedder, tuple) else (embedder, embedder)
 
         if db_path.exists():
             gr.Info(f"기존 Vector Store를 로드합니다: {db_path}")
-            vector_store = Chroma(persist_directory=str(db_path), embedding_function=embedder)
+            if use_faiss:
+                try:
+                    vector_store = FaissFlatStore.load(db_path, query_embedder)
+                except Exception as e:
+                    gr.Error(f"Vector Store 로드 중 오류 발생: {e}")
+                    return None, f"오류: {e}"
+            else:
+                vector_store = Chroma(persist_directory=str(db_path), embedding_function=embedder)
             status_message = f"✅ 로드 완료: {db_path.name}"
             return vector_store, status_message
         
@@ -383,23 +673,47 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
             gr.Warning("데이터를 불러오지 못했습니다.")
             return None, "오류: 데이터 로딩 실패"
 
-        texts = [preprocess_text(item['text'], preprocess_options) for item in data]
+        texts = preprocess_texts([item['text'] for item in data], preprocess_options)
         metadatas = [{'category': item['category']} for item in data]
-        documents = [Document(page_content=t, metadata=m) for t, m in zip(texts, metadatas)]
 
         try:
-            vector_store = Chroma.from_documents(
-                documents=documents,
-                embedding=embedder,
-                persist_directory=str(db_path),
-                collection_metadata={"hnsw:space": "cosine"}
-            )
-            status_message = f"✅ 생성 및 저장 완료: {db_path.name}"
-            return vector_store, status_message
+            if use_faiss:
+                # 소규모 코퍼스는 HNSW 대신 정확한 전수 내적 검색이 더 빠름
+                vecs, _ = embed_with_cache(passage_embedder, model_name, preprocess_options, texts)
+                vector_store = FaissFlatStore.build(
+                    texts, [m['category'] for m in metadatas], vecs, query_embedder, db_path
+                )
+            else:
+                vector_store = Chroma(
+                    persist_directory=str(db_path),
+                    embedding_function=embedder,
+                    collection_metadata={"hnsw:space": "cosine"}
+                )
+                # 임베딩은 디스크 캐시에서 재사용하고, 없는 것만 새로 계산
+                # (Chroma 내부에서 다시 임베딩하지 않음)
+                vecs, _ = embed_with_cache(passage_embedder, model_name, preprocess_options, texts)
+
+                # 같은 문장이 여러 행(반복되는 머리말, 다른 카테고리)에 있어도 모두 남도록
+                # 문장 해시에 행 번호를 붙여 id를 만듦
+                ids = [f"{hashlib.sha1(t.encode()).hexdigest()[:16]}-{idx}" for idx, t in enumerate(texts)]
+                add_to_collection(vector_store._collection, ids, vecs, texts, metadatas)
         except Exception as e:
             gr.Error(f"Vector Store 생성 중 오류 발생: {e}")
             return None, f"오류: {e}"
 
+        if not use_faiss:
+            # 직접 계산 경로에서 재임베딩 없이 쓸 수 있도록 행렬과 문장 정보를 함께 저장
+            # (선택적 최적화이므로 실패해도 이미 만들어진 Vector Store는 그대로 사용)
+            try:
+                save_corpus_matrix(
+                    db_path, vecs, [item['text'] for item in data], [m['category'] for m in metadatas],
+                    get_source_signature(source_type, file_obj)
+                )
+            except Exception as e:
+                gr.Warning(f"임베딩 행렬 저장에 실패했습니다: {e}")
+        status_message = f"✅ 생성 및 저장 완료: {db_path.name}"
+        return vector_store, status_message
+
     def search_from_vector_store(query, vector_store, top_k, model_name, preprocess_options):
         """Vector Store에서 유사도 검색을 수행합니다."""
         if not query:
@@ -411,8 +725,9 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
 
         processed_query = preprocess_text(query, preprocess_options)
         
-        results_with_scores = vector_store.similarity_search_with_score(
-            query=processed_query, 
+        query_vec = _embed_query_cached(model_name, tuple(sorted(preprocess_options)), processed_query)
+        results_with_scores = vector_store.similarity_search_by_vector_with_relevance_scores(
+            embedding=list(query_vec),
             k=top_k
         )
 
@@ -438,16 +753,25 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
 
         return df, fig, summary
 
-    def run_analysis_wrapper(backend, query, vector_store, model_name, top_k, threshold, preprocess_options, source_type, file_obj, use_chunking, chunk_size, chunk_overlap):
+    def run_analysis_wrapper(backend, query, vector_store, model_name, top_k, threshold, preprocess_options, source_type, file_obj, use_chunking, chunk_size, chunk_overlap, use_int8):
         """백엔드 선택에 따라 분석을 실행하는 라우터 함수"""
         if backend == "직접 계산 (기존 방식)":
-            data = load_sentences(source_type, file_obj, use_chunking, chunk_size, chunk_overlap)
+            file_name = os.path.basename(file_obj.name) if file_obj else "내장 샘플"
+            db_path = get_db_path(file_name, model_name, preprocess_options, use_chunking, chunk_size, chunk_overlap)
+            # 같은 설정·같은 원본 파일로 만든 Vector Store가 있으면 저장된 행렬을 써서 파일 파싱과 임베딩을 건너뜀
+            data, doc_vecs = None, None
+            if file_obj is not None or source_type == "내장 샘플":
+                data, doc_vecs = load_corpus_matrix(db_path, get_source_signature(source_type, file_obj))
+            if data is None:
+                data = load_sentences(source_type, file_obj, use_chunking, chunk_size, chunk_overlap)
             if not data:
                 return pd.DataFrame(), None, "데이터를 불러오지 못했습니다. 소스를 확인해주세요.", vector_store
-            df, fig, summary = calculate_similarity(query, data, model_name, top_k, threshold, preprocess_options)
+            df, fig, summary = calculate_similarity(
+                query, data, model_name, top_k, threshold, preprocess_options, db_path.name, use_int8, doc_vecs
+            )
             return df, fig, summary, vector_store
         
-        elif backend == "ChromaDB Vector Store":
+        elif backend in ("ChromaDB Vector Store", "FAISS Flat IP"):
             df, fig, summary = search_from_vector_store(query, vector_store, top_k, model_name, preprocess_options)
             return df, fig, summary, vector_store
         
@@ -468,13 +792,13 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
     def on_setting_change():
         return None, "⚠️ 설정이 변경되었습니다. Vector Store를 다시 생성/로드해야 합니다."
     
-    settings_inputs = [data_source_radio, file_uploader, model_selector, preprocess_options_checkbox, use_chunking_checkbox, chunk_size_slider, chunk_overlap_slider]
+    settings_inputs = [backend_selector, data_source_radio, file_uploader, model_selector, preprocess_options_checkbox, use_chunking_checkbox, chunk_size_slider, chunk_overlap_slider]
     for setting_input in settings_inputs:
         setting_input.change(fn=on_setting_change, outputs=[vector_store_state, vs_status_textbox])
 
     create_vs_button.click(
         fn=create_or_load_vector_store,
-        inputs=[data_source_radio, file_uploader, model_selector, preprocess_options_checkbox, use_chunking_checkbox, chunk_size_slider, chunk_overlap_slider],
+        inputs=[backend_selector, data_source_radio, file_uploader, model_selector, preprocess_options_checkbox, use_chunking_checkbox, chunk_size_slider, chunk_overlap_slider],
         outputs=[vector_store_state, vs_status_textbox]
     )
 
@@ -483,7 +807,7 @@ with gr.Blocks(theme=gr.themes.Soft()) as demo:
         inputs=[
             backend_selector, query_input, vector_store_state, model_selector, top_k_slider, threshold_slider, 
             preprocess_options_checkbox, data_source_radio, file_uploader,
-            use_chunking_checkbox, chunk_size_slider, chunk_overlap_slider
+            use_chunking_checkbox, chunk_size_slider, chunk_overlap_slider, int8_checkbox
         ],
         outputs=[result_table, result_plot, summary_output, vector_store_state]
     )